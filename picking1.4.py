@@ -1,11 +1,17 @@
 import streamlit as st
 import pandas as pd
 import os
-from datetime import time, datetime
+from datetime import datetime
+import io
 import plotly.express as px
 import json
+import hashlib
+import tempfile
+import time
 import numpy as np
-import re
+import polars as pl
+from concurrent.futures import ThreadPoolExecutor
+from pyarrow import feather
 
 # --------------------------------------------------------------------------
 # Streamlit 페이지 기본 설정
@@ -17,11 +23,21 @@ st.set_page_config(
 )
 
 DAYS_ORDER = ['월요일', '화요일', '수요일', '목요일', '금요일', '토요일']
+WORKER_COLUMNS = ['작업자명', '피킹횟수', '1회평균분']
+# 평균 소요시간은 float 그대로 두고 화면에 표시할 때만 반올림
+MINUTE_COLUMN_CONFIG = {
+    '평균소요시간(분)': st.column_config.NumberColumn(format='%.0f'),
+    '평균소요시간_분': st.column_config.NumberColumn(format='%.0f')
+}
 
 # --------------------------------------------------------------------------
 # 설정 파일 처리 및 데이터 처리 함수
 # --------------------------------------------------------------------------
 CONFIG_FILE = "config.json"
+CACHE_DIR = "cache"
+CACHE_VERSION = 6
+CACHE_MAX_FILES = 60
+CACHE_MAX_AGE = 30 * 24 * 3600
 
 def save_config(config_data):
     with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
@@ -38,59 +54,199 @@ def load_config():
             pass
     return default_config
 
-def convert_time_to_seconds(t):
-    if isinstance(t, (time, datetime)):
-        return t.hour * 3600 + t.minute * 60 + t.second
-    return np.nan
+def triple_rank(df, cols, ascending):
+    # 여러 컬럼의 pandas rank(method='min') 순위를 한 번의 정렬로 계산 (내림차순 컬럼은 부호를 뒤집음, 동점은 같은 최소 순위)
+    keys = df[cols].to_numpy(dtype=float) * np.where(ascending, 1, -1)
+    sorted_keys = np.sort(keys, axis=0)
+    ranks = np.empty(keys.shape, dtype=int)
+    for i in range(keys.shape[1]):
+        ranks[:, i] = np.searchsorted(sorted_keys[:, i], keys[:, i], side='left') + 1
+    return ranks
 
-@st.cache_data
-def load_and_process_data(uploaded_files):
-    if not uploaded_files:
-        return pd.DataFrame(), pd.DataFrame()
+def pick_count_expr(dtype):
+    # calamine이 숫자로 읽은 피킹횟수는 그대로 캐스팅하고, 텍스트가 섞인 경우에만 문자열을 숫자로 변환
+    col = pl.col('피킹횟수')
+    if dtype.is_numeric():
+        return col.cast(pl.Int32, strict=False)
+    return col.cast(pl.String).str.strip_chars().cast(pl.Float64, strict=False).cast(pl.Int32, strict=False)
+
+def duration_seconds_expr(dtype):
+    # 1회평균분 컬럼의 엑셀 타입(시간/기간/텍스트)에 맞춰 초 단위로 변환하는 polars 식
+    col = pl.col('1회평균분')
+    if dtype == pl.Duration:
+        return col.dt.total_seconds()
+    if dtype == pl.String:
+        col = col.str.extract(r'(\d{1,2}:\d{2}:\d{2})').str.to_time('%H:%M:%S', strict=False)
+    elif dtype not in (pl.Datetime, pl.Time):
+        return pl.lit(None)
+    return col.dt.hour().cast(pl.Int32) * 3600 + col.dt.minute().cast(pl.Int32) * 60 + col.dt.second().cast(pl.Int32)
+
+def process_one_file(file_name, file_bytes):
+    try:
+        date_str = os.path.basename(file_name).replace('피킹바코드입력-', '').split('.')[0]
+        pickup_date = datetime.strptime(date_str, '%Y%m%d')
+        
+        if pickup_date.weekday() == 6: return None
+
+        # calamine 엔진으로 '작업자현황' 시트의 필요한 3개 열만 읽음 (헤더는 3행)
+        df = pl.read_excel(io.BytesIO(file_bytes), sheet_name='작업자현황', engine='calamine',
+                           read_options={'header_row': 2}, columns=WORKER_COLUMNS)
+        df = df.select(
+            pl.col('작업자명').cast(pl.String),
+            pick_count_expr(df.schema['피킹횟수']),
+            duration_seconds_expr(df.schema['1회평균분']).cast(pl.Int32).alias('소요시간(초)')
+        ).filter(pl.col('작업자명').str.strip_chars() != '')
+        if df.is_empty(): return None
+        # 파일 하나가 하루치이므로 날짜 파생 컬럼은 스칼라로 한 번에 채움
+        return df.with_columns(
+            pl.lit(pickup_date).alias('날짜'),
+            pl.lit(pickup_date.year, dtype=pl.Int16).alias('연도'),
+            pl.lit(pickup_date.month, dtype=pl.Int16).alias('월'),
+            pl.lit(pickup_date.day, dtype=pl.Int16).alias('일'),
+            pl.lit(pickup_date.strftime('%Y-%m')).alias('연월'),
+            pl.lit(DAYS_ORDER[pickup_date.weekday()]).alias('요일')
+        )
+    except Exception:
+        # [수정] 개별 파일 오류 메시지를 표시하지 않고 그냥 건너뜀
+        return None
+
+def process_uploaded_files(uploaded_files):
+    # calamine 파싱은 GIL 밖의 Rust 코드에서 돌기 때문에 스레드 풀로 파일을 병렬 처리
+    file_names = [uploaded_file.name for uploaded_file in uploaded_files]
+    file_bytes = [uploaded_file.getvalue() for uploaded_file in uploaded_files]
+    with ThreadPoolExecutor(max_workers=min(len(uploaded_files), os.cpu_count() or 1)) as executor:
+        data_list = [df for df in executor.map(process_one_file, file_names, file_bytes) if df is not None]
+
+    if not data_list: return pd.DataFrame(), pd.DataFrame()
 
-    valid_data_list, all_workers_list = [], []
+    # 파일별 프레임은 process_one_file에서 같은 스키마로 맞춰 두었으므로 복사 없이 청크만 이어 붙임
+    # 전체 작업자 목록은 한글 이름/유효값 필터 전에 한 번의 concat 결과에서 추출
+    master_df = pl.concat(data_list, how='vertical', rechunk=False)
+    all_workers_df = master_df.select(['날짜', '연도', '월', '요일', '작업자명']).unique(subset=['날짜', '작업자명'], maintain_order=True)
+    # 한글 이름 판정은 작업자명 고유값에만 수행: 첫 글자 범위 비교로 대부분 통과시키고, 나머지만 정규식으로 확인
+    names = master_df.get_column('작업자명').unique()
+    leading_hangul = names.str.slice(0, 1).is_between('가', '힣')
+    other_names = names.filter(~leading_hangul)
+    hangul_names = pl.concat([names.filter(leading_hangul), other_names.filter(other_names.str.contains('[가-힣]'))])
+    valid_master_df = master_df.filter(
+        pl.col('작업자명').is_in(hangul_names.implode())
+    ).drop_nulls(subset=['피킹횟수', '소요시간(초)']).with_columns(
+        (pl.col('소요시간(초)') / 60.0).cast(pl.Float32).alias('평균소요시간(분)')
+    ).with_columns(
+        (pl.col('평균소요시간(분)').cast(pl.Float64) * pl.col('피킹횟수')).alias('가중시간')
+    )
+    if valid_master_df.is_empty(): return pd.DataFrame(), pd.DataFrame()
+
+    # 화면/차트 코드는 pandas 기반이므로 결과를 돌려주기 직전에 한 번만 변환
+    # 작업자명은 두 결과가 같은 categories를 공유하는 category로 변환해 groupby/merge가 정수 코드로 동작하도록 함
+    category_dtypes = {
+        '작업자명': pd.CategoricalDtype(sorted(master_df['작업자명'].unique().to_list())),
+        '요일': pd.CategoricalDtype(DAYS_ORDER, ordered=True)
+    }
+    final_cols = ['날짜', '연도', '월', '일', '연월', '요일', '작업자명', '피킹횟수', '평균소요시간(분)', '가중시간']
+    return valid_master_df.select(final_cols).to_pandas().astype(category_dtypes), all_workers_df.to_pandas().astype(category_dtypes)
+
+def uploaded_files_key(uploaded_files):
+    # 업로드 파일의 이름과 내용으로 만든 키 (디스크 캐시 파일명과 필터 캐시 키로 사용)
+    hasher = hashlib.sha1(str(CACHE_VERSION).encode())
     for uploaded_file in uploaded_files:
+        hasher.update(uploaded_file.name.encode('utf-8'))
+        hasher.update(uploaded_file.getbuffer())
+    return hasher.hexdigest()
+
+def write_cache_file(path, write):
+    # 세션(스레드)마다 고유한 임시 파일에 쓴 뒤 교체해 반쯤 쓰인 캐시 파일이 노출되지 않도록 함
+    with tempfile.NamedTemporaryFile(dir=CACHE_DIR, suffix='.tmp', delete=False) as f:
+        tmp_path = f.name
         try:
-            date_str = os.path.basename(uploaded_file.name).replace('피킹바코드입력-', '').split('.')[0]
-            pickup_date = pd.to_datetime(date_str, format='%Y%m%d')
-            
-            if pickup_date.weekday() == 6: continue
-
-            df = pd.read_excel(uploaded_file, sheet_name='작업자현황', header=2, usecols=['작업자명', '피킹횟수', '1회평균분'],
-                               dtype={'작업자명': str, '피킹횟수': str, '1회평균분': str})
-            df.dropna(subset=['작업자명'], inplace=True)
-            df = df[df['작업자명'].str.strip() != '']
-            if df.empty: continue
-            df['날짜'] = pickup_date
-            all_workers_list.append(df[['날짜', '작업자명']])
-            hangul_pattern = re.compile(r'[가-힣]+')
-            df = df[df['작업자명'].apply(lambda x: hangul_pattern.search(str(x)) is not None)]
-            df['피킹횟수'] = pd.to_numeric(df['피킹횟수'], errors='coerce')
-            df.dropna(subset=['피킹횟수'], inplace=True)
-            temp_time = pd.to_datetime(df['1회평균분'], errors='coerce').dt.time
-            df['유효시간'] = temp_time
-            df.dropna(subset=['유효시간'], inplace=True)
-            if not df.empty: valid_data_list.append(df)
+            write(f)
         except Exception:
-            # [수정] 개별 파일 오류 메시지를 표시하지 않고 그냥 건너뜀
-            continue
-            
-    if not valid_data_list: return pd.DataFrame(), pd.DataFrame()
-
-    valid_master_df = pd.concat(valid_data_list, ignore_index=True)
-    all_workers_df = pd.concat(all_workers_list, ignore_index=True).drop_duplicates()
-    valid_master_df['피킹횟수'] = valid_master_df['피킹횟수'].astype(int)
-    valid_master_df['소요시간(초)'] = valid_master_df['유효시간'].apply(convert_time_to_seconds)
-    valid_master_df['평균소요시간(분)'] = valid_master_df['소요시간(초)'] / 60.0
-    valid_master_df['연도'] = valid_master_df['날짜'].dt.year
-    valid_master_df['월'] = valid_master_df['날짜'].dt.month
-    valid_master_df['일'] = valid_master_df['날짜'].dt.day
-    valid_master_df['연월'] = valid_master_df['날짜'].dt.to_period('M').astype(str)
-    days_map = {i: day for i, day in enumerate(DAYS_ORDER)}
-    valid_master_df['요일'] = valid_master_df['날짜'].dt.weekday.map(days_map)
-    valid_master_df['요일'] = pd.Categorical(valid_master_df['요일'], categories=DAYS_ORDER, ordered=True)
-    final_cols = ['날짜', '연도', '월', '일', '연월', '요일', '작업자명', '피킹횟수', '평균소요시간(분)']
-    return valid_master_df[final_cols], all_workers_df
+            f.close()
+            os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, path)
+
+def prune_cache():
+    # 최근에 사용한 CACHE_MAX_FILES개 파일만 남기고, 오래된 캐시 파일과 남은 임시 파일은 삭제
+    now = time.time()
+    stale, entries = [], []
+    for entry in os.scandir(CACHE_DIR):
+        mtime = entry.stat().st_mtime
+        if entry.name.endswith('.tmp'):
+            if now - mtime > 3600:
+                stale.append(entry.path)
+        elif now - mtime > CACHE_MAX_AGE:
+            stale.append(entry.path)
+        else:
+            entries.append((mtime, entry.path))
+    entries.sort(reverse=True)
+    for path in stale + [path for _, path in entries[CACHE_MAX_FILES:]]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def load_and_process_data(uploaded_files, cache_key):
+    if not uploaded_files:
+        return pd.DataFrame(), pd.DataFrame()
+
+    # 처리 결과를 Arrow(feather) 파일로 디스크에 캐시 (유효 데이터가 없는 업로드는 빈 표시 파일로 캐시)
+    valid_path = os.path.join(CACHE_DIR, f"{cache_key}.valid.feather")
+    workers_path = os.path.join(CACHE_DIR, f"{cache_key}.workers.feather")
+    empty_path = os.path.join(CACHE_DIR, f"{cache_key}.empty")
+    try:
+        if os.path.exists(empty_path):
+            os.utime(empty_path)
+            return pd.DataFrame(), pd.DataFrame()
+        if os.path.exists(valid_path) and os.path.exists(workers_path):
+            cached = feather.read_feather(valid_path, memory_map=True), feather.read_feather(workers_path, memory_map=True)
+            os.utime(valid_path)
+            os.utime(workers_path)
+            return cached
+    except Exception:
+        # 손상되었거나 다른 세션이 정리한 캐시 파일은 캐시 미스로 처리
+        pass
+
+    valid_master_df, all_workers_df = process_uploaded_files(uploaded_files)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        if valid_master_df.empty:
+            write_cache_file(empty_path, lambda f: None)
+        else:
+            write_cache_file(valid_path, lambda f: feather.write_feather(valid_master_df, f, compression='uncompressed'))
+            write_cache_file(workers_path, lambda f: feather.write_feather(all_workers_df, f, compression='uncompressed'))
+        prune_cache()
+    except OSError:
+        # 캐시 저장 실패는 결과에 영향이 없으므로 무시
+        pass
+    return valid_master_df, all_workers_df
+
+@st.cache_data(max_entries=64, ttl=3600)
+def apply_filters(data_key, _valid_data, _all_workers, minute_threshold, picking_count_threshold,
+                  filter_type="전체", selected_year=None, selected_month=None, selected_date=None, selected_days=None):
+    # 데이터프레임 인자(_ 접두사)는 해시하지 않고 업로드 데이터 키와 기준/필터 값만으로 캐시
+    data = _valid_data[(_valid_data['평균소요시간(분)'] <= minute_threshold) & (_valid_data['피킹횟수'] >= picking_count_threshold)]
+    workers = _all_workers
+    if filter_type == "연도별":
+        data = data[data['연도'] == selected_year]
+        workers = workers[workers['연도'] == selected_year]
+    elif filter_type == "월별":
+        data = data[(data['연도'] == selected_year) & (data['월'] == selected_month)]
+        workers = workers[(workers['연도'] == selected_year) & (workers['월'] == selected_month)]
+    elif filter_type == "일별":
+        data = data[data['날짜'] == pd.to_datetime(selected_date)]
+        workers = workers[workers['날짜'] == pd.to_datetime(selected_date)]
+    elif filter_type == "요일별":
+        if not selected_days:
+            return pd.DataFrame(), pd.DataFrame()
+        data = data[data['요일'].isin(selected_days)]
+        workers = workers[workers['요일'].isin(selected_days)]
+    return data, workers
+
+@st.cache_data(max_entries=16, ttl=3600)
+def get_periods(data_key, _base_data, minute_threshold, picking_count_threshold):
+    # 기준값이 적용된 데이터의 (연도, 월) 조합만 뽑아 필터 위젯 옵션으로 사용
+    return _base_data[['연도', '월']].drop_duplicates().sort_values(['연도', '월'], ascending=[False, True])
 
 # --------------------------------------------------------------------------
 # Streamlit 앱 UI
@@ -115,13 +271,13 @@ with col2:
 
 base_data, all_workers = pd.DataFrame(), pd.DataFrame()
 if uploaded_files:
-    base_data, all_workers = load_and_process_data(uploaded_files)
-    if not base_data.empty:
-        base_data = base_data[base_data['평균소요시간(분)'] <= minute_threshold].copy()
-        base_data = base_data[base_data['피킹횟수'] >= picking_count_threshold].copy()
+    data_key = uploaded_files_key(uploaded_files)
+    loaded_data, all_workers = load_and_process_data(uploaded_files, data_key)
+    if not loaded_data.empty:
+        base_data, _ = apply_filters(data_key, loaded_data, all_workers, minute_threshold, picking_count_threshold)
 
-filtered_data = base_data.copy()
-filtered_all_workers = all_workers.copy()
+filtered_data = base_data
+filtered_all_workers = all_workers
 
 if not base_data.empty:
     # [수정] 파일 수와 기간만 요약해서 표시
@@ -134,37 +290,28 @@ if not base_data.empty:
     filter_col1, filter_col2, filter_col3 = st.columns(3)
     with filter_col1:
         filter_type = st.selectbox("필터 종류", ["전체", "연도별", "월별", "일별", "요일별"])
+    period_options = get_periods(data_key, base_data, minute_threshold, picking_count_threshold)
     
+    selected_year = selected_month = selected_date = selected_days_kr = None
     if filter_type == "연도별":
         with filter_col2:
-            years = sorted(base_data['연도'].unique(), reverse=True)
+            years = period_options['연도'].unique()
             selected_year = st.selectbox("연도 선택", years)
-        filtered_data = base_data[base_data['연도'] == selected_year]
-        filtered_all_workers = all_workers[all_workers['날짜'].dt.year == selected_year]
     elif filter_type == "월별":
         with filter_col2:
-            years = sorted(base_data['연도'].unique(), reverse=True)
+            years = period_options['연도'].unique()
             selected_year = st.selectbox("연도 선택", years)
         with filter_col3:
-            months = sorted(base_data[base_data['연도'] == selected_year]['월'].unique())
+            months = period_options.loc[period_options['연도'] == selected_year, '월'].to_numpy()
             selected_month = st.selectbox("월 선택", months)
-        filtered_data = base_data[(base_data['연도'] == selected_year) & (base_data['월'] == selected_month)]
-        filtered_all_workers = all_workers[(all_workers['날짜'].dt.year == selected_year) & (all_workers['날짜'].dt.month == selected_month)]
     elif filter_type == "일별":
         with filter_col2:
             selected_date = st.date_input("날짜 선택", base_data['날짜'].max())
-        filtered_data = base_data[base_data['날짜'] == pd.to_datetime(selected_date)]
-        filtered_all_workers = all_workers[all_workers['날짜'] == pd.to_datetime(selected_date)]
     elif filter_type == "요일별":
         with filter_col2:
-            days_of_week_map = {'월요일': 0, '화요일': 1, '수요일': 2, '목요일': 3, '금요일': 4, '토요일': 5}
-            selected_days_kr = st.multiselect("요일 선택", options=days_of_week_map.keys(), default=list(days_of_week_map.keys()))
-        if selected_days_kr:
-            selected_weekdays = [days_of_week_map[day] for day in selected_days_kr]
-            filtered_data = base_data[base_data['날짜'].dt.weekday.isin(selected_weekdays)]
-            filtered_all_workers = all_workers[all_workers['날짜'].dt.weekday.isin(selected_weekdays)]
-        else:
-            filtered_data, filtered_all_workers = pd.DataFrame(), pd.DataFrame()
+            selected_days_kr = st.multiselect("요일 선택", options=DAYS_ORDER, default=DAYS_ORDER)
+    filtered_data, filtered_all_workers = apply_filters(data_key, loaded_data, all_workers, minute_threshold, picking_count_threshold,
+                                                        filter_type, selected_year, selected_month, selected_date, selected_days_kr)
 
 if st.button('분석 시작', type="primary"):
     if filtered_data.empty and filtered_all_workers.empty:
@@ -177,7 +324,7 @@ if st.button('분석 시작', type="primary"):
         st.success(f"분석 완료! (기간 내 총 피킹 횟수: {int(total_picks):,} 건)")
 
         st.header("2. 종합 분석 결과")
-        avg_time_minutes = (filtered_data['평균소요시간(분)'] * filtered_data['피킹횟수']).sum() / total_picks if total_picks > 0 else 0
+        avg_time_minutes = filtered_data['가중시간'].sum() / total_picks if total_picks > 0 else 0
         daily_avg_workers = filtered_data.groupby('날짜')['작업자명'].nunique().mean()
         
         col1, col2, col3 = st.columns(3)
@@ -191,43 +338,48 @@ if st.button('분석 시작', type="primary"):
         
         with tabs[0]:
             st.subheader("작업자별 성과 요약")
-            worker_analysis = filtered_data.groupby('작업자명').agg(
-                평균소요시간_분=pd.NamedAgg(column='평균소요시간(분)', aggfunc=lambda x: (x * filtered_data.loc[x.index, '피킹횟수']).sum() / filtered_data.loc[x.index, '피킹횟수'].sum()),
-                총_피킹횟수=('피킹횟수', 'sum'),
-                작업일수=('날짜', 'nunique')
-            ).reset_index()
+            worker_groups = filtered_data.groupby('작업자명', observed=True)
+            worker_picks = worker_groups['피킹횟수'].sum()
+            worker_analysis = pd.DataFrame({
+                '평균소요시간_분': worker_groups['가중시간'].sum() / worker_picks,
+                '총_피킹횟수': worker_picks,
+                '작업일수': worker_groups['날짜'].nunique()
+            }).reset_index()
 
             all_period_workers = pd.DataFrame(filtered_all_workers['작업자명'].unique(), columns=['작업자명'])
             final_worker_analysis = pd.merge(all_period_workers, worker_analysis, on='작업자명', how='left').fillna(0)
             
-            final_worker_analysis['시간순위'] = final_worker_analysis['평균소요시간_분'].rank(method='min', ascending=True).where(final_worker_analysis['총_피킹횟수'] > 0, 0)
-            final_worker_analysis['횟수순위'] = final_worker_analysis['총_피킹횟수'].rank(method='min', ascending=False).where(final_worker_analysis['총_피킹횟수'] > 0, 0)
             final_worker_analysis['작업일수'] = final_worker_analysis['작업일수'].astype(int)
             final_worker_analysis['일평균_피킹횟수'] = (final_worker_analysis['총_피킹횟수'] / final_worker_analysis['작업일수']).where(final_worker_analysis['작업일수'] > 0, 0).round(1)
-            final_worker_analysis['일평균순위'] = final_worker_analysis['일평균_피킹횟수'].rank(method='min', ascending=False).where(final_worker_analysis['총_피킹횟수'] > 0, 0)
+            has_picks = final_worker_analysis['총_피킹횟수'].to_numpy() > 0
+            worker_ranks = triple_rank(final_worker_analysis, ['평균소요시간_분', '총_피킹횟수', '일평균_피킹횟수'], [True, False, False])
+            final_worker_analysis[['시간순위', '횟수순위', '일평균순위']] = np.where(has_picks[:, None], worker_ranks, 0)
 
             final_worker_analysis[['총_피킹횟수', '시간순위', '횟수순위', '일평균순위']] = final_worker_analysis[['총_피킹횟수', '시간순위', '횟수순위', '일평균순위']].astype(int)
-            final_worker_analysis['평균소요시간_분'] = final_worker_analysis['평균소요시간_분'].round().astype(int)
 
             display_cols = ['작업자명', '평균소요시간_분', '시간순위', '총_피킹횟수', '횟수순위', '작업일수', '일평균_피킹횟수', '일평균순위']
-            st.dataframe(final_worker_analysis[display_cols].sort_values(by='시간순위'), hide_index=True)
+            st.dataframe(final_worker_analysis[display_cols].sort_values(by='시간순위'), hide_index=True, column_config=MINUTE_COLUMN_CONFIG)
 
-            fig_avg_time = px.bar(final_worker_analysis[final_worker_analysis['총_피킹횟수']>0].sort_values(by='평균소요시간_분'), x='작업자명', y='평균소요시간_분', title='작업자별 평균 피킹 소요시간 (분)', text_auto=True)
+            fig_avg_time = px.bar(final_worker_analysis.loc[final_worker_analysis['총_피킹횟수']>0, ['작업자명', '평균소요시간_분']].sort_values(by='평균소요시간_분'), x='작업자명', y='평균소요시간_분', title='작업자별 평균 피킹 소요시간 (분)', text_auto='.0f')
             st.plotly_chart(fig_avg_time, use_container_width=True)
-            fig_pick_count = px.bar(final_worker_analysis.sort_values(by='총_피킹횟수', ascending=False), x='작업자명', y='총_피킹횟수', title='작업자별 기간 내 총 피킹 횟수', text_auto=True)
+            fig_pick_count = px.bar(final_worker_analysis[['작업자명', '총_피킹횟수']].sort_values(by='총_피킹횟수', ascending=False), x='작업자명', y='총_피킹횟수', title='작업자별 기간 내 총 피킹 횟수', text_auto=True)
             st.plotly_chart(fig_pick_count, use_container_width=True)
-            fig_daily_avg = px.bar(final_worker_analysis.sort_values(by='일평균_피킹횟수', ascending=False), x='작업자명', y='일평균_피킹횟수', title='작업자별 일평균 피킹 횟수', text_auto='.1f')
+            fig_daily_avg = px.bar(final_worker_analysis[['작업자명', '일평균_피킹횟수']].sort_values(by='일평균_피킹횟수', ascending=False), x='작업자명', y='일평균_피킹횟수', title='작업자별 일평균 피킹 횟수', text_auto='.1f')
             st.plotly_chart(fig_daily_avg, use_container_width=True)
 
         with tabs[1]:
             st.subheader("기간별 성과 추이")
             if not filtered_data.empty:
                 group_by_period = filtered_data['날짜'].dt.to_period('M' if filter_type in ["전체", "연도별"] else 'D')
-                trend_analysis = filtered_data.groupby(group_by_period).apply(lambda x: (x['평균소요시간(분)'] * x['피킹횟수']).sum() / x['피킹횟수'].sum() if x['피킹횟수'].sum() > 0 else 0).reset_index(name='평균소요시간_분')
-                trend_analysis.rename(columns={'날짜': '기간'}, inplace=True)
-                trend_analysis['기간'] = trend_analysis['기간'].astype(str)
-                trend_analysis['평균소요시간_분'] = trend_analysis['평균소요시간_분'].round().astype(int)
-                fig_trend_time = px.line(trend_analysis, x='기간', y='평균소요시간_분', title='기간별 평균 피킹 소요시간 추이', markers=True)
+                # 기간 코드별 가중합을 bincount로 한 번에 계산 (groupby 미사용)
+                period_codes, periods = pd.factorize(group_by_period, sort=True)
+                period_weighted = np.bincount(period_codes, weights=filtered_data['가중시간'].to_numpy())
+                period_picks = np.bincount(period_codes, weights=filtered_data['피킹횟수'].to_numpy())
+                trend_analysis = pd.DataFrame({
+                    '기간': periods.astype(str),
+                    '평균소요시간_분': np.divide(period_weighted, period_picks, out=np.zeros_like(period_weighted), where=period_picks > 0)
+                })
+                fig_trend_time = px.line(trend_analysis, x='기간', y='평균소요시간_분', title='기간별 평균 피킹 소요시간 추이', markers=True, hover_data={'평균소요시간_분': ':.0f'})
                 st.plotly_chart(fig_trend_time, use_container_width=True)
             else:
                 st.info("기간 내 유효한 피킹 작업 데이터가 없어 추이 분석을 표시할 수 없습니다.")
@@ -235,22 +387,22 @@ if st.button('분석 시작', type="primary"):
         with tabs[2]:
             st.subheader("요일별 성과 분석")
             if not filtered_data.empty:
-                dow_analysis = filtered_data.groupby('요일', observed=False).apply(lambda x: pd.Series({
-                    '총_피킹횟수': x['피킹횟수'].sum(),
-                    '평균소요시간_분': (x['평균소요시간(분)'] * x['피킹횟수']).sum() / x['피킹횟수'].sum() if x['피킹횟수'].sum() > 0 else 0,
-                    '작업일수': x['날짜'].nunique()
-                })).reset_index()
+                dow_analysis = filtered_data.groupby('요일', observed=False).agg(
+                    총_피킹횟수=('피킹횟수', 'sum'),
+                    가중합=('가중시간', 'sum'),
+                    작업일수=('날짜', 'nunique')
+                ).reset_index()
+                dow_analysis['평균소요시간_분'] = (dow_analysis['가중합'] / dow_analysis['총_피킹횟수']).fillna(0)
                 dow_analysis['일평균_피킹횟수'] = (dow_analysis['총_피킹횟수'] / dow_analysis['작업일수']).fillna(0).round(1)
-                dow_analysis['평균소요시간_분'] = dow_analysis['평균소요시간_분'].round().astype(int)
-                dow_analysis['시간순위'] = dow_analysis['평균소요시간_분'].rank(method='min', ascending=True).astype(int)
+                dow_analysis['시간순위'] = dow_analysis['평균소요시간_분'].round().rank(method='min', ascending=True).astype(int)
                 dow_analysis['횟수순위'] = dow_analysis['총_피킹횟수'].rank(method='min', ascending=False).astype(int)
                 
                 dow_display_cols = ['요일', '평균소요시간_분', '시간순위', '총_피킹횟수', '횟수순위', '작업일수', '일평균_피킹횟수']
-                st.dataframe(dow_analysis[dow_display_cols].sort_values(by='요일', key=lambda x: x.map({day: i for i, day in enumerate(DAYS_ORDER)})), hide_index=True)
+                st.dataframe(dow_analysis[dow_display_cols].sort_values(by='요일', key=lambda x: x.map({day: i for i, day in enumerate(DAYS_ORDER)})), hide_index=True, column_config=MINUTE_COLUMN_CONFIG)
                 
-                fig_dow_time = px.bar(dow_analysis, x='요일', y='평균소요시간_분', title='요일별 평균 피킹 소요시간 (분)', text_auto=True)
+                fig_dow_time = px.bar(dow_analysis[['요일', '평균소요시간_분']], x='요일', y='평균소요시간_분', title='요일별 평균 피킹 소요시간 (분)', text_auto='.0f')
                 st.plotly_chart(fig_dow_time, use_container_width=True)
-                fig_dow_count = px.bar(dow_analysis, x='요일', y='총_피킹횟수', title='요일별 총 피킹 횟수', text_auto=True)
+                fig_dow_count = px.bar(dow_analysis[['요일', '총_피킹횟수']], x='요일', y='총_피킹횟수', title='요일별 총 피킹 횟수', text_auto=True)
                 st.plotly_chart(fig_dow_count, use_container_width=True)
             else:
                 st.info("기간 내 유효한 피킹 작업 데이터가 없어 요일별 분석을 표시할 수 없습니다.")
@@ -260,10 +412,9 @@ if st.button('분석 시작', type="primary"):
             display_df = filtered_data.sort_values(by=['날짜', '작업자명'], ascending=[False, True]).copy()
             display_df['시간순위'] = display_df['평균소요시간(분)'].rank(method='min', ascending=True).astype(int)
             display_df['횟수순위'] = display_df['피킹횟수'].rank(method='min', ascending=False).astype(int)
-            display_df['평균소요시간(분)'] = display_df['평균소요시간(분)'].round().astype(int)
             
             detail_cols = ['날짜', '요일', '작업자명', '피킹횟수', '횟수순위', '평균소요시간(분)', '시간순위']
-            st.dataframe(display_df[detail_cols], hide_index=True)
+            st.dataframe(display_df[detail_cols], hide_index=True, column_config=MINUTE_COLUMN_CONFIG)
             
 # --------------------------------------------------------------------------
 # 개발자 서명 (화면 우측 하단 고정)